@@ -1,29 +1,43 @@
 import streamlit as st
 import os
-import PIL.Image
 from dotenv import load_dotenv
-import google.generativeai as genai
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import atexit
+import base64
+import io
 import json
+import queue
 import re
-from googletrans import Translator
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 ################################################################################
 # Section 1: Configuration and Initialization
 #
-# Loads environment variables (Gemini API key), configures Gemini and the translator,
-# and initializes the Streamlit page.
+# Loads environment variables (Gemini API key and the optional USE_OFFLINE_TRANSLATE flag),
+# provides the Gemini model as a process-wide cached resource, and initializes the Streamlit page.
+# Heavy dependencies (Gemini SDK, Selenium, webdriver-manager, PIL, googletrans) are imported
+# inside the functions that use them, so rendering the form does not load them.
 ################################################################################
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GOOGLE_API_KEY)
-model = genai.GenerativeModel(model_name="gemini-2.0-flash")
-translator = Translator()
+
+@st.cache_resource
+def _get_model():
+    import google.generativeai as genai
+    genai.configure(api_key=GOOGLE_API_KEY)
+    return genai.GenerativeModel(model_name="gemini-2.0-flash")
+
+# Gemini returns English values directly; set USE_OFFLINE_TRANSLATE=1 to also run googletrans.
+USE_OFFLINE_TRANSLATE = os.getenv("USE_OFFLINE_TRANSLATE", "").lower() in ("1", "true", "yes")
+
+# Appended to every extraction prompt so no separate translation pass is needed.
+ENGLISH_OUTPUT_INSTRUCTION = " All string values in the JSON output MUST be translated to English regardless of source language."
 
 st.set_page_config(page_title="End-to-End Amazon Ad Extractor & Quality Scorer", layout="centered")
 st.title("End-to-End Amazon Ad Extractor & Quality Scorer")
@@ -34,6 +48,7 @@ url = st.text_input("Enter the URL of the product page", placeholder="https://ww
 # Section 2: Clean JSON Response Function
 #
 # Removes markdown code fences and a leading "json" label from the response.
+# parse_json uses orjson when it is installed and falls back to the standard library.
 ################################################################################
 def clean_json_response(text: str) -> str:
     cleaned_text = text.strip("` \n")
@@ -41,6 +56,11 @@ def clean_json_response(text: str) -> str:
         cleaned_text = cleaned_text[len("json"):].strip()
     return cleaned_text
 
+def parse_json(text: str):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
 ################################################################################
 # Section 3: Augment Final JSON Using Regex
 #
@@ -48,11 +68,54 @@ def clean_json_response(text: str) -> str:
 # Modifications include:
 #  - Always override the availability with "In Stock" if "in stock" is found in the raw text.
 #  - If MRP is missing, calculate it using current price and discount (if available).
+#  - Return early, without scanning for any other field, when all of them are already populated.
 ################################################################################
+# Each pattern is searched on its own rather than folded into one alternation:
+# a single search stops at its first match and can skip ahead on its literal
+# prefix, and an alternation would drop overlapping matches (e.g. an
+# "Ingredients:" that sits on the same line as "Sold by").
+_MRP_RE = re.compile(r"M\.R\.P\.?:\s*(₹[\d,\.]+?)(?=\s*M\.R\.P\.?:|$)", re.IGNORECASE)
+_UNIT_PRICE_RE = re.compile(r"([\d₹,\.]+)\s*per\s*(kg|g|L|ml)", re.IGNORECASE)
+_CURRENT_WITH_RE = re.compile(r"(₹[\d,\.]+)\s+with")
+_CURRENT_RE = re.compile(r"(₹[\d,\.]+)")
+_DISCOUNT_RE = re.compile(r"(-\d+%\s*)")
+_IN_STOCK_RE = re.compile(r"in stock", re.IGNORECASE)
+_DELIVERY_FREE_RE = re.compile(r"(FREE scheduled delivery[^\n]+)", re.IGNORECASE)
+_DELIVERY_SOON_RE = re.compile(r"(scheduled delivery as soon as[^\n]+)", re.IGNORECASE)
+_SHIPPING_RE = re.compile(r"(Delivering to\s+[^\n]+)", re.IGNORECASE)
+_SELLER_RE = re.compile(r"Sold by\s*([^\n\r]+)", re.IGNORECASE)
+_WEIGHT_RE = re.compile(r"Weight[:\-]?\s*([\d,\.]+\s*(kg|g))", re.IGNORECASE)
+_INGREDIENTS_RE = re.compile(r"Ingredients[:\-]?\s*([\w\s,]+)", re.IGNORECASE)
+_REVIEW_RE = re.compile(r"(\d+(\.\d+)?\s*out of\s*\d+\s*stars)", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_PRICE_STRIP = str.maketrans("", "", "₹,")
+
+# (section, key) pairs that augment_final_json can fill from the raw text.
+_AUGMENTED_FIELDS = (
+    ("pricing", "MRP"),
+    ("pricing", "unit_price"),
+    ("pricing", "current_price"),
+    ("pricing", "discount"),
+    ("delivery", "estimated_delivery_time"),
+    ("delivery", "shipping_details"),
+    ("seller", "seller_name"),
+    ("specifications", "weight"),
+    ("specifications", "ingredients"),
+    ("reviews", "summary"),
+)
+
 def augment_final_json(final_json: dict, raw_text: str) -> dict:
+    # --- Delivery: Availability (Override if "in stock" is found) ---
+    if _IN_STOCK_RE.search(raw_text):
+        final_json.setdefault("delivery", {})["availability"] = "In Stock"
+
+    # --- Skip the field scans entirely when the model already filled every field ---
+    if all((final_json.get(section) or {}).get(key) for section, key in _AUGMENTED_FIELDS):
+        return final_json
+
     # --- Pricing: Extract MRP if missing or calculate it ---
     if not final_json.get("pricing", {}).get("MRP"):
-        mrp_match = re.search(r"M\.R\.P\.?:\s*(₹[\d,\.]+?)(?=\s*M\.R\.P\.?:|$)", raw_text, re.IGNORECASE)
+        mrp_match = _MRP_RE.search(raw_text)
         if mrp_match:
             final_json.setdefault("pricing", {})["MRP"] = mrp_match.group(1).strip()
         else:
@@ -60,8 +123,8 @@ def augment_final_json(final_json: dict, raw_text: str) -> dict:
             discount_str = final_json.get("pricing", {}).get("discount")
             if current_price_str and discount_str:
                 try:
-                    discount_percentage = float(re.findall(r'\d+', discount_str)[0]) / 100.0
-                    current_price_num = float(current_price_str.replace("₹", "").replace(",", ""))
+                    discount_percentage = float(_DIGITS_RE.search(discount_str).group()) / 100.0
+                    current_price_num = float(current_price_str.translate(_PRICE_STRIP))
                     if discount_percentage < 1.0 and discount_percentage > 0:
                         mrp_val = current_price_num / (1 - discount_percentage)
                         final_json.setdefault("pricing", {})["MRP"] = f"₹{mrp_val:,.2f}"
@@ -70,65 +133,61 @@ def augment_final_json(final_json: dict, raw_text: str) -> dict:
 
     # --- Pricing: Extract Unit Price ---
     if not final_json.get("pricing", {}).get("unit_price"):
-        unit_price_match = re.search(r"([\d₹,\.]+)\s*per\s*(kg|g|L|ml)", raw_text, re.IGNORECASE)
+        unit_price_match = _UNIT_PRICE_RE.search(raw_text)
         if unit_price_match:
             final_json.setdefault("pricing", {})["unit_price"] = f"{unit_price_match.group(1).strip()} per {unit_price_match.group(2).strip()}"
 
     # --- Pricing: Extract Current Price ---
     if not final_json.get("pricing", {}).get("current_price"):
-        current_price_match = re.search(r"(₹[\d,\.]+)\s+with", raw_text)
+        current_price_match = _CURRENT_WITH_RE.search(raw_text)
         if current_price_match:
             final_json.setdefault("pricing", {})["current_price"] = current_price_match.group(1).strip()
         else:
-            current_price_match = re.search(r"(₹[\d,\.]+)", raw_text)
+            current_price_match = _CURRENT_RE.search(raw_text)
             if current_price_match:
                 final_json.setdefault("pricing", {})["current_price"] = current_price_match.group(1).strip()
 
     # --- Pricing: Extract Discount ---
     if not final_json.get("pricing", {}).get("discount"):
-        discount_match = re.search(r"(-\d+%\s*)", raw_text)
+        discount_match = _DISCOUNT_RE.search(raw_text)
         if discount_match:
             final_json.setdefault("pricing", {})["discount"] = discount_match.group(1).strip()
 
-    # --- Delivery: Availability (Override if "in stock" is found) ---
-    if "in stock" in raw_text.lower():
-        final_json.setdefault("delivery", {})["availability"] = "In Stock"
-
     # --- Delivery: Estimated Delivery Time ---
     if not final_json.get("delivery", {}).get("estimated_delivery_time"):
-        delivery_time_match = re.search(r"(FREE scheduled delivery[^\n]+)", raw_text, re.IGNORECASE)
+        delivery_time_match = _DELIVERY_FREE_RE.search(raw_text)
         if not delivery_time_match:
-            delivery_time_match = re.search(r"(scheduled delivery as soon as[^\n]+)", raw_text, re.IGNORECASE)
+            delivery_time_match = _DELIVERY_SOON_RE.search(raw_text)
         if delivery_time_match:
             final_json.setdefault("delivery", {})["estimated_delivery_time"] = delivery_time_match.group(1).strip()
 
     # --- Delivery: Shipping Details ---
     if not final_json.get("delivery", {}).get("shipping_details"):
-        shipping_details_match = re.search(r"(Delivering to\s+[^\n]+)", raw_text, re.IGNORECASE)
+        shipping_details_match = _SHIPPING_RE.search(raw_text)
         if shipping_details_match:
             final_json.setdefault("delivery", {})["shipping_details"] = shipping_details_match.group(1).strip()
 
     # --- Seller: Extract Seller Name ---
     if not final_json.get("seller", {}).get("seller_name"):
-        seller_match = re.search(r"Sold by\s*([^\n\r]+)", raw_text, re.IGNORECASE)
+        seller_match = _SELLER_RE.search(raw_text)
         if seller_match:
             final_json.setdefault("seller", {})["seller_name"] = seller_match.group(1).strip()
 
     # --- Specifications: Extract Weight ---
     if not final_json.get("specifications", {}).get("weight"):
-        weight_match = re.search(r"Weight[:\-]?\s*([\d,\.]+\s*(kg|g))", raw_text, re.IGNORECASE)
+        weight_match = _WEIGHT_RE.search(raw_text)
         if weight_match:
             final_json.setdefault("specifications", {})["weight"] = weight_match.group(1).strip()
 
     # --- Specifications: Extract Ingredients ---
     if not final_json.get("specifications", {}).get("ingredients"):
-        ingredients_match = re.search(r"Ingredients[:\-]?\s*([\w\s,]+)", raw_text, re.IGNORECASE)
+        ingredients_match = _INGREDIENTS_RE.search(raw_text)
         if ingredients_match:
             final_json.setdefault("specifications", {})["ingredients"] = ingredients_match.group(1).strip()
 
     # --- Reviews: Extract Summary ---
     if not final_json.get("reviews", {}).get("summary"):
-        review_match = re.search(r"(\d+(\.\d+)?\s*out of\s*\d+\s*stars)", raw_text, re.IGNORECASE)
+        review_match = _REVIEW_RE.search(raw_text)
         if review_match:
             final_json.setdefault("reviews", {})["summary"] = review_match.group(1).strip()
 
@@ -137,41 +196,120 @@ def augment_final_json(final_json: dict, raw_text: str) -> dict:
 ################################################################################
 # Section 4: Full-Page Screenshot Capture
 #
-# Uses Selenium to load the page, scroll for lazy loading, and capture a full-page screenshot.
+# Uses Selenium to load the page, scroll for lazy loading, and capture a full-page screenshot
+# in memory through the Chrome DevTools Protocol.
+# A single Chrome driver is started once per process and shared by all sessions; a lock
+# serializes its use from navigation through reset. The chromedriver binary is also
+# resolved once per process. Images and web fonts are not loaded, since only the page
+# text is needed for OCR.
 ################################################################################
-def capture_fullpage_screenshot(url):
+BLOCKED_RESOURCE_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf"]
+
+@st.cache_resource
+def _chromedriver_path():
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+@st.cache_resource
+def _driver_lock():
+    return threading.Lock()
+
+@st.cache_resource
+def _get_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.7049.85 Safari/537.36")
     chrome_options.add_argument("--ignore-certificate-errors")
-    
-    service = Service(ChromeDriverManager().install())
+    chrome_options.add_argument("--window-size=1920,1080")
+    # OCR only needs the rendered page text, so skip images, web fonts, and background traffic.
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--metrics-recording-only")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+
+    service = Service(_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
-    
     driver.set_page_load_timeout(60)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS})
+    atexit.register(_quit_driver, driver)
+    return driver
+
+def _discard_driver(driver):
+    _get_driver.clear()
+    _quit_driver(driver)
+
+def _wait_until(driver, timeout, condition, poll_frequency=0.2):
+    # Bounded readiness wait: proceed with whatever has rendered once the timeout expires.
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
     try:
-        driver.get(url)
-    except Exception as e:
-        st.error("Page load timed out. Please check your internet connection or the URL.")
-        driver.quit()
-        return None
-    time.sleep(5)
+        WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+    except TimeoutException:
+        pass
+
+def _height_stable(quiet_polls=3):
+    # True once document.body.scrollHeight has been the same for quiet_polls consecutive polls,
+    # i.e. post-load scripts and lazy sections have stopped growing the page.
+    heights = []
+    def condition(d):
+        heights.append(d.execute_script("return document.body.scrollHeight"))
+        recent = heights[-quiet_polls:]
+        return len(recent) == quiet_polls and len(set(recent)) == 1
+    return condition
+
+def capture_fullpage_screenshot(url):
+    import PIL.Image
+
+    with _driver_lock():
+        driver = _get_driver()
     
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
+        try:
+            driver.get(url)
+        except Exception as e:
+            st.error("Page load timed out. Please check your internet connection or the URL.")
+            _discard_driver(driver)
+            return None
+        # driver.get already blocks until readyState is "complete"; give post-load scripts time to settle.
+        _wait_until(driver, 5, _height_stable())
     
-    scroll_height = driver.execute_script("return document.body.scrollHeight")
-    driver.set_window_size(1920, scroll_height)
-    time.sleep(2)
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        # Let scroll-triggered lazy sections finish loading before measuring the page.
+        _wait_until(driver, 5, _height_stable())
     
-    screenshot_path = "screenshot.png"
-    driver.save_screenshot(screenshot_path)
-    driver.quit()
+        # Capture the whole document in one pass via CDP instead of resizing the window to its height.
+        metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+        content_size = metrics.get("cssContentSize") or metrics["contentSize"]
+        screenshot = driver.execute_cdp_cmd("Page.captureScreenshot", {
+            "format": "png",
+            "captureBeyondViewport": True,
+            "fromSurface": True,
+            "clip": {"x": 0, "y": 0, "width": content_size["width"], "height": content_size["height"], "scale": 1},
+        })
+        driver.delete_all_cookies()
+        driver.get("about:blank")
     
     try:
-        image = PIL.Image.open(screenshot_path).convert("RGB")
+        image = PIL.Image.open(io.BytesIO(base64.b64decode(screenshot["data"])))
+        image.load()
     except Exception as e:
         st.error("Error opening screenshot: " + str(e))
         return None
@@ -183,43 +321,122 @@ def capture_fullpage_screenshot(url):
 # Splits the captured image into two regions:
 # - Top region: Expected to contain the product title, description, and pricing details.
 # - Bottom region: Expected to contain delivery, seller info, specifications, and reviews.
+# Each region is converted to RGB after cropping, so the full screenshot is never copied.
 ################################################################################
 def segment_image(image):
     width, height = image.size
-    top_region = image.crop((0, 0, width, height // 2))
-    bottom_region = image.crop((0, height // 2, width, height))
+    top_region = image.crop((0, 0, width, height // 2)).convert("RGB")
+    bottom_region = image.crop((0, height // 2, width, height)).convert("RGB")
     return top_region, bottom_region
 
 ################################################################################
 # Section 6: OCR Extraction on Image Segments
 #
-# Performs targeted OCR on the top and bottom regions with customized prompts.
+# Performs targeted OCR on the top and bottom regions with customized prompts. Each prompt
+# asks for its part of the buyer-focused JSON structure directly, and both responses are
+# streamed into the page as they are generated.
+# Each region is downscaled to at most MAX_UPLOAD_WIDTH pixels wide and uploaded as
+# JPEG bytes to keep request payloads small.
 ################################################################################
+MAX_UPLOAD_WIDTH = 1536
+UPLOAD_JPEG_QUALITY = 85
+
+def _prepare_region(region):
+    import PIL.Image
+
+    width, height = region.size
+    if width > MAX_UPLOAD_WIDTH:
+        scale = MAX_UPLOAD_WIDTH / width
+        region = region.resize((MAX_UPLOAD_WIDTH, max(1, int(height * scale))), PIL.Image.LANCZOS)
+    buffer = io.BytesIO()
+    region.save(buffer, format="JPEG", quality=UPLOAD_JPEG_QUALITY, optimize=True)
+    # Hand the SDK the encoded bytes; a PIL image would be re-encoded as lossless WebP.
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+
 def perform_ocr_on_segments(top_region, bottom_region):
     top_prompt = (
-        "Extract product title, description, and detailed pricing information (including current price, MRP, discount, and unit price) "
-        "from this image region. Look for indicators like '₹', 'MRP:' and discount percentages. Return structured text in JSON format."
+        "Extract the product title, description, and detailed pricing information from this image region, "
+        "from the perspective of a buyer. Look for indicators like '₹', 'MRP:' and discount percentages. "
+        "Please return valid JSON with the following keys:\n\n"
+        "1. basic_info: { 'title': <product title>, 'description': <detailed description> }\n"
+        "2. pricing: { 'current_price': <current price>, 'MRP': <MRP>, 'discount': <discount>, 'unit_price': <unit price> }\n\n"
+        "Return only valid JSON with these keys." + ENGLISH_OUTPUT_INSTRUCTION
     )
-    top_response = model.generate_content([top_prompt, top_region])
-    top_text = top_response.text
 
     bottom_prompt = (
-        "Extract details about delivery (availability, estimated delivery time, shipping details), seller information "
-        "(seller name, shipping origin, fulfillment info), product specifications (weight, dimensions, ingredients), "
-        "and a summary of customer reviews and ratings from this image region. Return the output in JSON format."
+        "Extract details about delivery, seller information, product specifications, and a summary of customer "
+        "reviews and ratings from this image region, from the perspective of a buyer. "
+        "Please return valid JSON with the following keys and use explicit markers where possible:\n\n"
+        "1. delivery: { 'availability': <availability>, 'estimated_delivery_time': <estimated delivery time>, 'shipping_details': <shipping details> }\n"
+        "2. seller: { 'seller_name': <seller name>, 'shipping_origin': <shipping origin>, 'fulfillment_info': <fulfillment info> }\n"
+        "3. specifications: { 'weight': <weight>, 'dimensions': <dimensions>, 'ingredients': <ingredients> }\n"
+        "4. reviews: { 'summary': <summary of customer reviews and ratings> }\n\n"
+        "Look for explicit markers such as 'Sold by:', 'Weight:', or 'out of 5 stars'. Return only valid JSON with these keys." +
+        ENGLISH_OUTPUT_INSTRUCTION
     )
-    bottom_response = model.generate_content([bottom_prompt, bottom_region])
-    bottom_text = bottom_response.text
 
-    combined_text = top_text + "\n" + bottom_text
-    return combined_text
+    # Both regions are independent, so each worker prepares its region (PIL releases the
+    # GIL while resizing and JPEG-encoding, and the SDK uploads those bytes without
+    # re-encoding) and then issues its request, concurrently with the other.
+    # Worker threads stream response chunks into a queue; the script thread renders them
+    # as they arrive, since Streamlit elements can only be updated from the script thread.
+    model = _get_model()
+    chunk_queue = queue.Queue()
+
+    def stream_region(name, prompt, region):
+        try:
+            region = _prepare_region(region)
+            for chunk in model.generate_content([prompt, region], stream=True):
+                chunk_queue.put((name, chunk.text))
+        finally:
+            chunk_queue.put((name, None))
+
+    parts = {"top": [], "bottom": []}
+    previews = {"top": st.empty(), "bottom": st.empty()}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(stream_region, "top", top_prompt, top_region),
+            executor.submit(stream_region, "bottom", bottom_prompt, bottom_region),
+        ]
+        remaining = len(futures)
+        while remaining:
+            name, text = chunk_queue.get()
+            if text is None:
+                remaining -= 1
+                continue
+            parts[name].append(text)
+            previews[name].code("".join(parts[name]))
+        for future in futures:
+            future.result()
+
+    for preview in previews.values():
+        preview.empty()
+    return "".join(parts["top"]), "".join(parts["bottom"])
 
 ################################################################################
 # Section 7: Reformatting OCR Text into Structured, Buyer-Focused JSON
 #
-# Uses a refined prompt to convert the raw OCR text into a JSON structure with keys:
-# basic_info, pricing, delivery, seller, specifications, and reviews.
+# merge_region_json combines the per-region JSON blobs into a single structure with keys:
+# basic_info, pricing, delivery, seller, specifications, and reviews. It returns None if
+# either region is not valid JSON, in which case reformat_ocr_text uses a refined prompt
+# to convert the raw OCR text into the same structure.
 ################################################################################
+def merge_region_json(*region_texts):
+    merged = {}
+    for text in region_texts:
+        try:
+            region_json = parse_json(clean_json_response(text))
+        except Exception:
+            return None
+        if not isinstance(region_json, dict):
+            return None
+        for section, fields in region_json.items():
+            if isinstance(fields, dict) and isinstance(merged.get(section), dict):
+                merged[section].update({k: v for k, v in fields.items() if v})
+            else:
+                merged[section] = fields
+    return merged
+
 def reformat_ocr_text(combined_text):
     buyer_prompt = (
         "Based on the following OCR text extracted from a product page:\n\n" +
@@ -232,13 +449,14 @@ def reformat_ocr_text(combined_text):
         "4. seller: { 'seller_name': <seller name>, 'shipping_origin': <shipping origin>, 'fulfillment_info': <fulfillment info> }\n"
         "5. specifications: { 'weight': <weight>, 'dimensions': <dimensions>, 'ingredients': <ingredients> }\n"
         "6. reviews: { 'summary': <summary of customer reviews and ratings> }\n\n"
-        "Look for explicit markers such as 'MRP:', 'Sold by:', 'Weight:', or 'out of 5 stars'. Return only valid JSON with these keys."
+        "Look for explicit markers such as 'MRP:', 'Sold by:', 'Weight:', or 'out of 5 stars'. Return only valid JSON with these keys." +
+        ENGLISH_OUTPUT_INSTRUCTION
     )
-    final_response = model.generate_content([buyer_prompt])
+    final_response = _get_model().generate_content([buyer_prompt])
     final_text = final_response.text
     cleaned_text = clean_json_response(final_text)
     try:
-        final_json = json.loads(cleaned_text)
+        final_json = parse_json(cleaned_text)
     except Exception:
         final_json = {}
     final_json = augment_final_json(final_json, combined_text)
@@ -247,61 +465,93 @@ def reformat_ocr_text(combined_text):
 ################################################################################
 # Section 8: Multi-Language Translation Support
 #
-# Recursively translates all string fields in a JSON object into English.
+# Collects every string field in a JSON object that needs translating, sends them
+# to the translator in a single batched request, and rebuilds the object with the
+# translated values. ASCII-only strings are treated as already English and skipped.
+# Batches are memoized per (texts, language); if the batched request fails, each
+# string is translated individually (also memoized) before falling back to the original.
+# Only used when USE_OFFLINE_TRANSLATE is set; googletrans is imported on first use.
 ################################################################################
-def translate_json(obj, dest_language="en"):
+@st.cache_resource
+def _get_translator():
+    from googletrans import Translator
+    return Translator()
+
+def _needs_translation(text: str, dest_language: str) -> bool:
+    return bool(text) and not (dest_language == "en" and text.isascii())
+
+def _collect_strings(obj, dest_language, acc):
     if isinstance(obj, str):
-        try:
-            translated = translator.translate(obj, dest=dest_language)
-            return translated.text
-        except Exception:
-            return obj
+        if _needs_translation(obj, dest_language):
+            acc.append(obj)
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _collect_strings(v, dest_language, acc)
+    elif isinstance(obj, list):
+        for item in obj:
+            _collect_strings(item, dest_language, acc)
+    return acc
+
+def _apply_translations(obj, translations):
+    if isinstance(obj, str):
+        return translations.get(obj, obj)
     elif isinstance(obj, dict):
-        return {k: translate_json(v, dest_language) for k, v in obj.items()}
+        return {k: _apply_translations(v, translations) for k, v in obj.items()}
     elif isinstance(obj, list):
-        return [translate_json(item, dest_language) for item in obj]
+        return [_apply_translations(item, translations) for item in obj]
     else:
         return obj
 
+@lru_cache(maxsize=4096)
+def _translate_cached(text: str, dest_language: str) -> str:
+    return _get_translator().translate(text, dest=dest_language).text
+
+@lru_cache(maxsize=256)
+def _translate_batch_cached(texts: tuple, dest_language: str) -> tuple:
+    return tuple(t.text for t in _get_translator().translate(list(texts), dest=dest_language))
+
+def translate_json(obj, dest_language="en"):
+    pending = tuple(dict.fromkeys(_collect_strings(obj, dest_language, [])))
+    if not pending:
+        return obj
+    try:
+        translations = dict(zip(pending, _translate_batch_cached(pending, dest_language)))
+    except Exception:
+        translations = {}
+        for text in pending:
+            try:
+                translations[text] = _translate_cached(text, dest_language)
+            except Exception:
+                pass
+    return _apply_translations(obj, translations)
+
 ################################################################################
 # Section 9: Quality Scoring (Automated Moderation)
 #
 # Computes a quality score based on the completeness of key fields.
 ################################################################################
+# (section, key, points) awarded when the field is present and non-empty.
+_SCORE_SPEC = (
+    ("basic_info", "title", 10),
+    ("basic_info", "description", 10),
+    ("pricing", "current_price", 10),
+    ("pricing", "MRP", 5),
+    ("pricing", "discount", 5),
+    ("pricing", "unit_price", 5),
+    ("delivery", "availability", 5),
+    ("delivery", "estimated_delivery_time", 5),
+    ("delivery", "shipping_details", 5),
+    ("seller", "seller_name", 5),
+    ("seller", "shipping_origin", 3),
+    ("seller", "fulfillment_info", 3),
+    ("specifications", "weight", 5),
+    ("specifications", "dimensions", 3),
+    ("specifications", "ingredients", 5),
+    ("reviews", "summary", 10),
+)
+
 def quality_score(final_json):
-    score = 0
-    if final_json.get("basic_info", {}).get("title"):
-        score += 10
-    if final_json.get("basic_info", {}).get("description"):
-        score += 10
-    if final_json.get("pricing", {}).get("current_price"):
-        score += 10
-    if final_json.get("pricing", {}).get("MRP"):
-        score += 5
-    if final_json.get("pricing", {}).get("discount"):
-        score += 5
-    if final_json.get("pricing", {}).get("unit_price"):
-        score += 5
-    if final_json.get("delivery", {}).get("availability"):
-        score += 5
-    if final_json.get("delivery", {}).get("estimated_delivery_time"):
-        score += 5
-    if final_json.get("delivery", {}).get("shipping_details"):
-        score += 5
-    if final_json.get("seller", {}).get("seller_name"):
-        score += 5
-    if final_json.get("seller", {}).get("shipping_origin"):
-        score += 3
-    if final_json.get("seller", {}).get("fulfillment_info"):
-        score += 3
-    if final_json.get("specifications", {}).get("weight"):
-        score += 5
-    if final_json.get("specifications", {}).get("dimensions"):
-        score += 3
-    if final_json.get("specifications", {}).get("ingredients"):
-        score += 5
-    if final_json.get("reviews", {}).get("summary"):
-        score += 10
+    score = sum(points for section, key, points in _SCORE_SPEC if (final_json.get(section) or {}).get(key))
 
     final_json["quality_score"] = score
     return final_json
@@ -312,21 +562,34 @@ def quality_score(final_json):
 # Orchestrates the entire process:
 #   1. Capture a full-page screenshot.
 #   2. Segment the image.
-#   3. Perform OCR on both regions.
-#   4. Reformat the raw OCR text into structured JSON.
-#   5. Translate the JSON text into English.
+#   3. Perform OCR on both regions, each returning its part of the structured JSON.
+#   4. Merge the regions into structured JSON (reformatting the raw OCR text if either
+#      region is not valid JSON) and fill missing fields via regex.
+#   5. Translate the JSON text into English with googletrans (only if USE_OFFLINE_TRANSLATE is set;
+#      otherwise Gemini already returns English values).
 #   6. Compute a quality score.
-# Returns the final JSON and the raw OCR text.
+# Returns the final JSON and the raw OCR text. Results are cached per URL for an hour;
+# a failed capture raises ScreenshotCaptureError so that it is not cached.
 ################################################################################
+class ScreenshotCaptureError(Exception):
+    pass
+
+@st.cache_data(ttl=3600, show_spinner=False)
 def extract_product_details(url):
     image = capture_fullpage_screenshot(url)
     if image is None:
-        return {"error": "Failed to capture screenshot due to page load timeout."}, ""
+        raise ScreenshotCaptureError("Failed to capture screenshot due to page load timeout.")
     top_region, bottom_region = segment_image(image)
-    combined_text = perform_ocr_on_segments(top_region, bottom_region)
-    structured_json = reformat_ocr_text(combined_text)
-    translated_json = translate_json(structured_json, dest_language="en")
-    final_result = quality_score(translated_json)
+    top_text, bottom_text = perform_ocr_on_segments(top_region, bottom_region)
+    combined_text = top_text + "\n" + bottom_text
+    structured_json = merge_region_json(top_text, bottom_text)
+    if structured_json is None:
+        structured_json = reformat_ocr_text(combined_text)
+    else:
+        structured_json = augment_final_json(structured_json, combined_text)
+    if USE_OFFLINE_TRANSLATE:
+        structured_json = translate_json(structured_json, dest_language="en")
+    final_result = quality_score(structured_json)
     return final_result, combined_text
 
 ################################################################################
@@ -334,14 +597,23 @@ def extract_product_details(url):
 #
 # The user enters a product URL; the app executes the extraction pipeline and displays
 # the final structured JSON (including quality score) and the raw OCR text.
+# "Force Refresh" discards cached results and re-runs the pipeline.
 ################################################################################
 st.subheader("Enter the Product URL to extract details:")
 url_input = st.text_input("Product URL", placeholder="https://www.amazon.in/…")
 
-if st.button("Extract Product Details"):
+extract_clicked = st.button("Extract Product Details")
+refresh_clicked = st.button("Force Refresh")
+if refresh_clicked:
+    extract_product_details.clear()
+
+if extract_clicked or refresh_clicked:
     if url_input:
         with st.spinner("Processing the product page..."):
-            final_json, raw_text = extract_product_details(url_input)
+            try:
+                final_json, raw_text = extract_product_details(url_input)
+            except ScreenshotCaptureError as e:
+                final_json, raw_text = {"error": str(e)}, ""
         if "error" in final_json:
             st.error(final_json["error"])
         else: